@@ -6,8 +6,19 @@ import random
 import sqlite3
 import datetime
 import numpy as np
-import copy
 import os
+from collections import OrderedDict
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    # Numba is optional; without it the AI kernels run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # Constants
 SCREEN_WIDTH = 1920
@@ -20,8 +31,15 @@ GAME_WIDTH = GRID_COLUMNS * BLOCK_SIZE
 GAME_HEIGHT = GRID_ROWS * BLOCK_SIZE
 SPACING = 90  # Space between the two game grids
 UI_HEIGHT = 100  # Space for score display
+LINE_SCORES = (40, 100, 300, 1200)  # Points for clearing 1 to 4 lines at once
+AI_CACHE_SIZE = 1 << 16  # Boards remembered by the AI's evaluation cache
+TEXT_CACHE_SIZE = 512  # Rendered text surfaces kept by TetrisGame._text
 
 MUSIC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "music.mp3")
+# The only event types let onto the queue. Every screen reads just QUIT and KEYDOWN (plus
+# VIDEOEXPOSE to redraw); TEXTINPUT fills in KEYDOWN's unicode and WINDOWEXPOSED carries
+# the expose notification, so those stay allowed too
+GAME_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.TEXTINPUT, pygame.WINDOWEXPOSED)
 
 # Colors
 BLACK = (20, 20, 20)
@@ -54,10 +72,65 @@ SHAPE_COLORS = [
     (220, 20, 60)     # Crimson for Z-piece
 ]
 
+# Grid cells hold an index into this palette; 0 is an empty cell
+PALETTE = np.array([BLACK] + SHAPE_COLORS, dtype=np.uint8)
+
+# Bit-packed columns: one integer per column, bit 0 is the bottom row. Column
+# height is then the word's bit length and holes are the unset bits below it.
+FULL_COLUMN = (1 << GRID_ROWS) - 1
+ROW_BITS = np.arange(GRID_ROWS - 1, -1, -1)  # Bit of each grid row (top to bottom) in a column word
+
+def _column_words(cells):
+    # Pack each column of a 2D occupancy array into a uint32, bit 0 = bottom row
+    weights = np.left_shift(1, np.arange(len(cells) - 1, -1, -1)).astype(np.uint32)
+    return ((np.asarray(cells) != 0) * weights[:, None]).sum(axis=0).astype(np.uint32)
+
+def _unique_rotations(shape):
+    # Distinct clockwise rotations of a shape; the O, I, S and Z pieces repeat
+    # after fewer than four turns
+    rotations = []
+    shape = tuple(map(tuple, shape))
+    while shape not in rotations:
+        rotations.append(shape)
+        shape = tuple(zip(*shape[::-1]))
+    return rotations
+
+# SHAPE_ROTS[shape_id][rotation] is the piece's cell layout for that rotation
+SHAPE_ROTS = [_unique_rotations(shape) for shape in SHAPES]
+
+def _piece_columns(shape):
+    # (column words, floors, height, cells) of a piece, where floors[i] is the
+    # number of empty cells below the piece's lowest cell in column i and cells
+    # lists the (y, x) offsets of its blocks
+    words = _column_words(shape)
+    floors = np.array([(int(word) & -int(word)).bit_length() - 1 for word in words], dtype=np.int64)
+    cells = tuple((y, x) for y, row in enumerate(shape) for x, cell in enumerate(row) if cell)
+    return words, floors, len(shape), cells
+
+# The same rotations in column form, used by the AI search
+SHAPE_ROT_COLUMNS = [[_piece_columns(rotation) for rotation in rotations]
+                     for rotations in SHAPE_ROTS]
+
+# The same rotations as (row offsets, column offsets) index arrays, used to stamp a piece
+SHAPE_ROT_CELLS = [[np.nonzero(rotation) for rotation in rotations]
+                   for rotations in SHAPE_ROTS]
+
+# Zobrist keys: one random 64-bit key per cell, a board's hash is the XOR of
+# the keys of its filled cells
+ZOBRIST = [[int(key) for key in row] for row in np.random.SeedSequence(0).generate_state(
+    GRID_ROWS * GRID_COLUMNS, dtype=np.uint64).reshape(GRID_ROWS, GRID_COLUMNS)]
+
+def _grid_hash(grid):
+    grid_hash = 0
+    for y, x in np.argwhere(grid):
+        grid_hash ^= ZOBRIST[y][x]
+    return grid_hash
+
 class Tetromino:
     def __init__(self):
-        self.shape = random.choice(SHAPES)
-        self.color = SHAPE_COLORS[SHAPES.index(self.shape)]
+        self.shape_id = random.randrange(len(SHAPES))
+        self.rotation = 0
+        self.color_idx = self.shape_id + 1  # Index into PALETTE
         self.x = GAME_WIDTH // BLOCK_SIZE // 2 - len(self.shape[0]) // 2
         self.y = 0
 
@@ -65,9 +138,80 @@ class Tetromino:
         self.x += dx
         self.y += dy
 
+    @property
+    def shape(self):
+        return SHAPE_ROTS[self.shape_id][self.rotation]
+
     def rotate(self):
         # Rotate clockwise
-        self.shape = list(zip(*self.shape[::-1]))
+        self.rotation = (self.rotation + 1) % len(SHAPE_ROTS[self.shape_id])
+
+def _clone(piece):
+    # Cheap field-by-field copy instead of copy.deepcopy
+    clone = Tetromino.__new__(Tetromino)
+    clone.shape_id = piece.shape_id
+    clone.rotation = piece.rotation
+    clone.color_idx = piece.color_idx
+    clone.x = piece.x
+    clone.y = piece.y
+    return clone
+
+@njit(cache=True)
+def _bit_length(word):
+    length = 0
+    while word:
+        word >>= 1
+        length += 1
+    return length
+
+@njit(cache=True)
+def _popcount(word):
+    count = 0
+    while word:
+        word &= word - 1
+        count += 1
+    return count
+
+@njit(cache=True)
+def _landing_shift(heights, piece_floors, piece_height, px, py):
+    # Bit of the board columns the piece's bottom row comes to rest on when
+    # dropped from (px, py), or -1 if it can't get there. px must keep the
+    # piece inside the board.
+
+    # The piece comes to rest on the highest column under it
+    shift = 0
+    for i in range(len(piece_floors)):
+        shift = max(shift, heights[px + i] - piece_floors[i])
+    # It also has to be able to fall there from where it currently is
+    if shift > GRID_ROWS - py - piece_height:
+        return -1
+    return shift
+
+@njit(cache=True)
+def _evaluate_placement(col_heights, col_holes, piece_cols, px, shift):
+    # Score the board with the piece placed at column px, landing shift (lower is better).
+    # Only the columns under the piece change, the rest come from the cached heights/holes.
+    board_height = 0
+    holes = 0
+    bumpiness = 0
+    prev_height = 0
+    for x in range(len(col_heights)):
+        column_height = int(col_heights[x])
+        holes += int(col_holes[x])
+        if px <= x < px + len(piece_cols):
+            # Cells above the top of the board don't count
+            word = (int(piece_cols[x - px]) << shift) & FULL_COLUMN
+            if word:
+                # The piece sits on top of the column: any gap under it or inside it becomes holes
+                top = _bit_length(word)
+                holes += top - column_height - _popcount(word)
+                column_height = top
+        if x > 0:
+            bumpiness += abs(column_height - prev_height)
+        prev_height = column_height
+        board_height = max(board_height, column_height)
+
+    return board_height * 2 + holes * 3 + bumpiness
 
 class TetrisPlayer:
     def __init__(self, x_offset=0, controls=None):
@@ -78,107 +222,115 @@ class TetrisPlayer:
         
     def reset(self):
         """Reset player state for game restart"""
-        self.grid = [[BLACK for _ in range(GRID_COLUMNS)] 
-                     for _ in range(GRID_ROWS)]
+        # Palette indices (see PALETTE), 0 for empty cells
+        self.grid = np.zeros((GRID_ROWS, GRID_COLUMNS), dtype=np.uint8)
+        # Same occupancy bit-packed per column (see FULL_COLUMN)
+        self.cols = np.zeros(GRID_COLUMNS, dtype=np.uint32)
+        # Height and number of holes of each column, kept up to date by lock_piece
+        self.col_heights = np.zeros(GRID_COLUMNS, dtype=np.int8)
+        self.col_holes = np.zeros(GRID_COLUMNS, dtype=np.int8)
+        self.grid_hash = 0
+
+        # Locked blocks are kept pre-drawn; BLACK is transparent so the grid lines show through
+        self.board_surf = pygame.Surface((GAME_WIDTH, GAME_HEIGHT)).convert()
+        self.board_surf.set_colorkey(BLACK)
+        self.board_dirty = True  # board_surf needs a full redraw from the grid
         self.current_piece = Tetromino()
         self.game_over = False
         self.score = 0
         self.survival_time = 0
 
 class AIPlayer(TetrisPlayer):
-    def calculate_board_height(self, grid):
-        for y in range(len(grid)):
-            if any(cell != BLACK for cell in grid[y]):
-                return len(grid) - y
-        return 0
-
-    def calculate_holes(self, grid):
-        holes = 0
-        for x in range(len(grid[0])):
-            found_block = False
-            for y in range(len(grid)):
-                if grid[y][x] != BLACK:
-                    found_block = True
-                elif found_block:
-                    holes += 1
-        return holes
-
-    def calculate_bumpiness(self, grid):
-        column_heights = [self.get_column_height(grid, x) for x in range(len(grid[0]))]
-        return sum(abs(column_heights[i] - column_heights[i+1]) for i in range(len(column_heights)-1))
-
-    def get_column_height(self, grid, column):
-        for y in range(len(grid)):
-            if grid[y][column] != BLACK:
-                return len(grid) - y
-        return 0
+    def __init__(self, x_offset=0, controls=None):
+        super().__init__(x_offset, controls)
+        # Zobrist hash of an evaluated board -> its score, least recently used first.
+        # Only used without Numba: a lookup costs more than the compiled evaluation
+        self.score_cache = OrderedDict()
+
+    def reset(self):
+        super().reset()
+        self.plan = None  # Move chosen for the current piece, see make_move
+
+    def score_placement(self, piece_columns, px, shift):
+        piece_cols, _, piece_height, piece_cells = piece_columns
+        if HAVE_NUMBA:
+            return _evaluate_placement(self.col_heights, self.col_holes, piece_cols, px, shift)
+
+        # Hash of the board with the piece placed, updated from the current board's hash
+        top = GRID_ROWS - shift - piece_height
+        board_hash = self.grid_hash
+        for y, x in piece_cells:
+            if top + y >= 0:
+                board_hash ^= ZOBRIST[top + y][px + x]
+
+        score = self.score_cache.get(board_hash)
+        if score is None:
+            score = _evaluate_placement(self.col_heights, self.col_holes, piece_cols, px, shift)
+            self.score_cache[board_hash] = score
+            if len(self.score_cache) > AI_CACHE_SIZE:
+                self.score_cache.popitem(last=False)
+        else:
+            self.score_cache.move_to_end(board_hash)
+        return score
 
     def make_move(self, game):
+        # Pick the best rotation and x position for the current piece (doesn't move it)
         best_score = float('inf')
+        piece = self.current_piece
         best_move = {
-            'rotation': 0,
-            'x': self.current_piece.x
+            'rotation': piece.rotation,
+            'x': piece.x
         }
 
-        for rotation in range(4):
-            test_piece = Tetromino()
-            test_piece.shape = copy.deepcopy(self.current_piece.shape)
-            test_piece.color = self.current_piece.color
-            test_piece.x = self.current_piece.x
-            test_piece.y = self.current_piece.y
-
-            # Rotate piece
-            for _ in range(rotation):
-                test_piece.rotate()
-
-            # Try different horizontal positions
-            for dx in range(-5, 6):
-                # Reset piece position and create a deep copy of the grid
-                test_piece.x = self.current_piece.x + dx
-                test_piece.y = self.current_piece.y
-                grid_copy = [row.copy() for row in self.grid]
-
-                # Simulate dropping the piece
-                temp_piece = copy.deepcopy(test_piece)
-                while game.is_valid_move(temp_piece, 0, 1, grid_copy):
-                    temp_piece.y += 1
-
-                # Check if the final position is valid and doesn't overwrite existing pieces
-                if game.is_valid_move(temp_piece, 0, 0, grid_copy):
-                    # Assess the board state without actually modifying the grid
-                    test_grid = [row.copy() for row in grid_copy]
-                    for y, row in enumerate(temp_piece.shape):
-                        for x, cell in enumerate(row):
-                            if cell:
-                                grid_x = temp_piece.x + x
-                                grid_y = temp_piece.y + y
-                                if 0 <= grid_y < len(test_grid):
-                                    test_grid[grid_y][grid_x] = temp_piece.color
-
-                    # Evaluate board state
-                    height = self.calculate_board_height(test_grid)
-                    holes = self.calculate_holes(test_grid)
-                    bumpiness = self.calculate_bumpiness(test_grid)
-
-                    # Scoring function (lower is better)
-                    score = height * 2 + holes * 3 + bumpiness
-
-                    if score < best_score:
-                        best_score = score
-                        best_move = {
-                            'rotation': rotation,
-                            'x': temp_piece.x
-                        }
-
-        # Apply best move
-        for _ in range(best_move['rotation']):
-            self.current_piece.rotate()
-        self.current_piece.x = best_move['x']
+        # Only distinct rotations are searched (one for O, two for I, S and Z)
+        for rotation, piece_columns in enumerate(SHAPE_ROT_COLUMNS[piece.shape_id]):
+            _, piece_floors, piece_height, _ = piece_columns
+
+            # Try every horizontal position that keeps the piece on the board
+            for x in range(GRID_COLUMNS - len(piece_floors) + 1):
+                shift = _landing_shift(self.col_heights, piece_floors, piece_height, x, piece.y)
+                if shift < 0:
+                    continue
+
+                score = self.score_placement(piece_columns, x, shift)
+                if score < best_score:
+                    best_score = score
+                    best_move = {
+                        'rotation': rotation,
+                        'x': x
+                    }
+
+        return best_move
+
+    def follow_plan(self, game):
+        # The plan is made once per piece, then carried out one action per frame
+        if self.plan is None:
+            self.plan = self.make_move(game)
+
+        # Rotate first; if the rotation is blocked where the piece is, move toward x and rotate there
+        piece = self.current_piece
+        if piece.rotation != self.plan['rotation']:
+            rotated_piece = _clone(piece)
+            rotated_piece.rotate()
+            if game.is_valid_move(rotated_piece, cols=self.cols):
+                piece.rotate()
+                return
+        if piece.x != self.plan['x']:
+            dx = 1 if self.plan['x'] > piece.x else -1
+            if game.is_valid_move(piece, dx=dx, cols=self.cols):
+                piece.move(dx, 0)
+                return
+        if piece.rotation != self.plan['rotation'] or piece.x != self.plan['x']:
+            # Blocked both ways: plan again from where the piece is now
+            self.plan = None
 
 class TetrisGame:
     def __init__(self):
         pygame.init()
         pygame.font.init()
+        # Filter events when they are queued, so the loops never see mouse motion and the like
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(GAME_EVENTS)
 
         pygame.mixer.music.load(MUSIC_PATH) 
         pygame.mixer.music.play(-1)  # -1 makes it loop indefinitely
@@ -186,12 +338,43 @@ class TetrisGame:
         self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         SCREEN_WIDTH, SCREEN_HEIGHT = self.screen.get_size()
         pygame.display.set_caption('eTetris')
+        # Draw a batch of (surface, position) pairs; pygame-ce's fblits is faster and neither returns rects
+        if hasattr(self.screen, 'fblits'):
+            self._blit_batch = self.screen.fblits
+        else:
+            self._blit_batch = lambda blits: self.screen.blits(blits, doreturn=False)
         self.clock = pygame.time.Clock()
 
+        # Grid lines never change, draw them once (+1 for the right and bottom edge lines).
+        # Every surface blitted each frame is converted to the display format when created
+        self.grid_surf = pygame.Surface((GAME_WIDTH + 1, GAME_HEIGHT + 1), pygame.SRCALPHA)
+        # Draw vertical lines
+        for x in range(GRID_COLUMNS + 1):
+            pygame.draw.line(self.grid_surf, GRAY, (x * BLOCK_SIZE, 0), (x * BLOCK_SIZE, GAME_HEIGHT), 1)
+        # Draw horizontal lines
+        for y in range(GRID_ROWS + 1):
+            pygame.draw.line(self.grid_surf, GRAY, (0, y * BLOCK_SIZE), (GAME_WIDTH, y * BLOCK_SIZE), 1)
+        self.grid_surf = self.grid_surf.convert_alpha()
+
         # Load custom fonts
         self.title_font = pygame.font.SysFont('tetris', 80)
         self.font = pygame.font.SysFont('OCR A Extended', 36)
         self.small_font = pygame.font.SysFont('OCR A Extended', 24)
+        self._title_surf = self.title_font.render('eTetris', True, WHITE).convert_alpha()
+        # Text that never changes, rendered once
+        self._run_instructions_surf = self.small_font.render(
+            "ESC: Exit Game | SPACE: Mute/Unmute | P: Pause/Unpause | R: Restart", True, GRAY).convert_alpha()
+        self._game_over_instructions_surf = self.small_font.render(
+            "ESC: Exit Game | SPACE: Mute/Unmute | P: Pause/Unpause | M: Main menu", True, GRAY).convert_alpha()
+        self._game_over_surf = self.font.render('GAME OVER', True, WHITE).convert_alpha()
+        self._pause_surf = self.font.render("PAUSED - Press P to resume", True, WHITE).convert_alpha()
+        self._pause_rect = self._pause_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        # Translucent overlay behind the confirmation dialog
+        self._dim_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self._dim_surf.fill((0, 0, 0, 180))
+        self._dim_surf = self._dim_surf.convert_alpha()
+        self._text_cache = {}
+        self._table_cache = {}  # Composed leaderboard/history tables
         
         # Calculate player grid positions
         self.human_x = (SCREEN_WIDTH - (2 * GAME_WIDTH + SPACING)) // 2
@@ -201,6 +384,21 @@ class TetrisGame:
                           'down': pygame.K_DOWN, 'rotate': pygame.K_UP}
         self.human_player = TetrisPlayer(x_offset=self.human_x, controls=human_controls)
         self.ai_player = AIPlayer(x_offset=self.ai_x)
+
+        # One pre-filled block per palette index, blitted for every visible cell
+        self.block_surfs = [None]
+        for color in PALETTE[1:]:
+            block = pygame.Surface((BLOCK_SIZE - 1, BLOCK_SIZE - 1)).convert()
+            block.fill(color)
+            self.block_surfs.append(block)
+        # Pixel offset of each grid column/row
+        self._col_pix = [x * BLOCK_SIZE for x in range(GRID_COLUMNS)]
+        self._row_pix = [y * BLOCK_SIZE for y in range(GRID_ROWS)]
+
+        # Compile the AI kernels now rather than on the AI's first move
+        piece_cols, piece_floors, piece_height, _ = SHAPE_ROT_COLUMNS[0][0]
+        _landing_shift(self.ai_player.col_heights, piece_floors, piece_height, 0, 0)
+        _evaluate_placement(self.ai_player.col_heights, self.ai_player.col_holes, piece_cols, 0, 0)
         
         self.game_over = False
         self.start_time = None
@@ -222,6 +420,10 @@ class TetrisGame:
         # Create SQLite database for high scores and game history
         self.conn = sqlite3.connect('src/tetris_database.db')
         cursor = self.conn.cursor()
+
+        # Write-ahead log with relaxed syncing: a commit no longer waits on a full fsync
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
         
         # Scores table
         cursor.execute('''
@@ -246,15 +448,28 @@ class TetrisGame:
                 date TEXT
             )
         ''')
+
+        # Indexes for the leaderboard (by score) and game history (by date) queries
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scores_score
+            ON scores(score DESC) WHERE username != 'AI'
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scores_date
+            ON scores(date DESC)
+        ''')
         
         self.conn.commit()
         
     def show_start_screen(self):
         start_screen = True
         human_player_name = ""
-        selected_menu = "Play"
+        menu_options = ["Play", "Leaderboard", "Game History"]
+        selected_idx = 0
+        selected_menu = menu_options[selected_idx]
         music_paused = False
         music_pause_toggled = False
+        self._table_cache.clear()  # Scores may have changed since the last visit
 
         while start_screen:
             self.screen.fill(DEEP_PURPLE)  # Deep purple background
@@ -262,19 +477,15 @@ class TetrisGame:
             screen_rect = self.screen.get_rect()  # Get the screen rect for easy centering
             
             # Title
-            title = self.title_font.render('eTetris', True, WHITE)
-            title_rect = title.get_rect(center=(screen_rect.centerx, screen_rect.top + 80))
-            self.screen.blit(title, title_rect)
-            
-            # Menu options 
-            menu_options = ["Play", "Leaderboard", "Game History"]
+            title_rect = self._title_surf.get_rect(center=(screen_rect.centerx, screen_rect.top + 80))
+            self.screen.blit(self._title_surf, title_rect)
             
             # Centered menu navigation
             menu_y = title_rect.bottom + 50
             menu_spacing = 300
             for i, option in enumerate(menu_options):
-                color = LIGHT_BLUE if option == selected_menu else WHITE
-                menu_text = self.font.render(option, True, color)
+                color = LIGHT_BLUE if i == selected_idx else WHITE
+                menu_text = self._text(option, self.font, color)
                 menu_rect = menu_text.get_rect(center=(screen_rect.centerx + (i - 1) * menu_spacing, menu_y))
                 self.screen.blit(menu_text, menu_rect)
             
@@ -285,19 +496,19 @@ class TetrisGame:
                 pygame.draw.rect(self.screen, LIGHT_BLUE, input_box, 3)  # Blue border
                 
                 # Player name input text
-                txt_surface = self.font.render(human_player_name, True, WHITE)
+                txt_surface = self._text(human_player_name, self.font, WHITE)
                 txt_rect = txt_surface.get_rect(center=input_box.center)
                 self.screen.blit(txt_surface, txt_rect)
                 
                 # Centered instruction text
-                name_prompt = self.font.render('Enter your username', True, WHITE)
+                name_prompt = self._text('Enter your username', self.font, WHITE)
                 prompt_rect = name_prompt.get_rect(center=(screen_rect.centerx, input_box.top - 40))
                 self.screen.blit(name_prompt, prompt_rect)
                 
                 # Centered start button
                 start_button = pygame.Rect(0, 0, 200, 50)
                 start_button.center = (screen_rect.centerx, input_box.bottom + 60)
-                start_text = self.font.render('START', True, BLACK)
+                start_text = self._text('START', self.font, BLACK)
                 start_text_rect = start_text.get_rect(center=start_button.center)
                 
                 # Button color changes based on username input
@@ -312,7 +523,7 @@ class TetrisGame:
                 self.show_game_history()
 
             # Centered bottom instructions
-            instructions = self.small_font.render("ESC: Exit | SPACE: Mute | ARROWS: Navigate", True, WHITE)
+            instructions = self._text("ESC: Exit | SPACE: Mute | ARROWS: Navigate", self.small_font, WHITE)
             instructions_rect = instructions.get_rect(center=(screen_rect.centerx, screen_rect.bottom - 50))
             self.screen.blit(instructions, instructions_rect)
 
@@ -330,9 +541,13 @@ class TetrisGame:
                     elif event.key == pygame.K_SPACE:
                         music_pause_toggled = True
                     elif event.key == pygame.K_LEFT:
-                        selected_menu = menu_options[(menu_options.index(selected_menu) - 1) % len(menu_options)]
+                        selected_idx = (selected_idx - 1) % len(menu_options)
+                        selected_menu = menu_options[selected_idx]
+                        self._table_cache.clear()
                     elif event.key == pygame.K_RIGHT:
-                        selected_menu = menu_options[(menu_options.index(selected_menu) + 1) % len(menu_options)]
+                        selected_idx = (selected_idx + 1) % len(menu_options)
+                        selected_menu = menu_options[selected_idx]
+                        self._table_cache.clear()
                     
                     if selected_menu == "Play":
                         if event.key == pygame.K_RETURN and human_player_name:
@@ -355,6 +570,7 @@ class TetrisGame:
                         pygame.mixer.music.unpause()
 
             human_player_name = human_player_name[:12]
+            self.clock.tick(60)
 
         return False
 
@@ -365,20 +581,18 @@ class TetrisGame:
         dialog_y = (SCREEN_HEIGHT - dialog_height) // 3
         
         # Darken background
-        s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 180))
-        self.screen.blit(s, (0, 0))
+        self.screen.blit(self._dim_surf, (0, 0))
         
         # Draw dialog box
         pygame.draw.rect(self.screen, DARK_BLUE, (dialog_x, dialog_y, dialog_width, dialog_height))
         pygame.draw.rect(self.screen, WHITE, (dialog_x, dialog_y, dialog_width, dialog_height), 2)
         
         # Title
-        title_text = self.font.render(title, True, WHITE)
+        title_text = self._text(title, self.font, WHITE)
         self.screen.blit(title_text, (dialog_x + 20, dialog_y + 20))
         
         # Message
-        msg_text = self.small_font.render(message, True, WHITE)
+        msg_text = self._text(message, self.small_font, WHITE)
         self.screen.blit(msg_text, (dialog_x + 20, dialog_y + 70))
         
         # Buttons
@@ -388,163 +602,166 @@ class TetrisGame:
         pygame.draw.rect(self.screen, (220, 20, 60), yes_button)
         pygame.draw.rect(self.screen, LIGHT_GREEN, no_button)
         
-        yes_text = self.small_font.render("[Y]", True, WHITE)
-        no_text = self.small_font.render("[N]", True, BLACK)
+        yes_text = self._text("[Y]", self.small_font, WHITE)
+        no_text = self._text("[N]", self.small_font, BLACK)
         
         self.screen.blit(yes_text, (yes_button.x + 20, yes_button.y + 10))
         self.screen.blit(no_text, (no_button.x + 20, no_button.y + 10))
         
         pygame.display.flip()
         
+        # Nothing changes until a key is pressed, so block instead of polling
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_y:
+                    return True
+                elif event.key == pygame.K_n:
                     return False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_y:
-                        return True
-                    elif event.key == pygame.K_n:
-                        return False
-
-    def show_leaderboard(self):
-        # Fetch top 10 scores
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT username, score, survival_time, date 
-            FROM scores 
-            WHERE username != 'AI'
-            ORDER BY score DESC 
-            LIMIT 10
-        ''')
-        scores = cursor.fetchall()
 
+    def _text(self, text, font, color):
+        # Rendered text surfaces; the dict keeps insertion order so the oldest entry is evicted first
+        key = (text, id(font), color)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            surf = font.render(text, True, color).convert_alpha()
+            self._text_cache[key] = surf
+            if len(self._text_cache) > TEXT_CACHE_SIZE:
+                del self._text_cache[next(iter(self._text_cache))]
+        return surf
+
+    def _score_table(self, rows):
+        # Compose the Rank/Name/Score/Time/Date table into one surface
+        columns = [0, 100, 400, 500, 600]
+        blits = [(self._text(header, self.small_font, LIGHT_BLUE), (x, 0))
+                 for header, x in zip(['Rank', 'Name', 'Score', 'Time', 'Date'], columns)]
+
+        for i, (rank, username, score, survival_time, date) in enumerate(rows, 1):
+            row_y = 40 + i * 30
+            
+            cells = [
+                str(rank),
+                username[:12],  # Limit name length
+                str(score),
+                f'{survival_time // 60:.0f}min',
+                date.split()[0],
+            ]
+            blits += [(self._text(cell, self.small_font, WHITE), (x, row_y))
+                      for cell, x in zip(cells, columns)]
+
+        width = max(x + surf.get_width() for surf, (x, _) in blits)
+        height = max(y + surf.get_height() for surf, (_, y) in blits)
+        # Opaque, on the start screen's background, so the text blends exactly as if drawn directly
+        table = pygame.Surface((width, height)).convert()
+        table.fill(DEEP_PURPLE)
+        table.blits(blits)
+        return table
+
+    def _blit_score_table(self, table):
         # Render leaderboard
         y_offset = SCREEN_HEIGHT // 5
 
-
         # Table setup
         table_width = 600
         table_x = (SCREEN_WIDTH - table_width) // 3 - 150
+        self.screen.blit(table, (table_x, y_offset + 40))
 
-        header_text = self.small_font.render('Rank', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x, y_offset + 40))
-        header_text = self.small_font.render('Name', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 100, y_offset + 40))
-        header_text = self.small_font.render('Score', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 400, y_offset + 40))
-        header_text = self.small_font.render('Time', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 500, y_offset + 40))
-        header_text = self.small_font.render('Date', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 600, y_offset + 40))
-
-
-
-        for i, (username, score, survival_time, date) in enumerate(scores, 1):
-            row_y = y_offset + 80 + i * 30
-            
-            rank_text = self.small_font.render(str(i), True, WHITE)
-            name_text = self.small_font.render(username[:12], True, WHITE)  # Limit name length
-            score_text = self.small_font.render(str(score), True, WHITE)
-            time_text = self.small_font.render(f'{survival_time // 60:.0f}min', True, WHITE)
-            date_text = self.small_font.render(date.split()[0], True, WHITE)
-
-            self.screen.blit(rank_text, (table_x, row_y))
-            self.screen.blit(name_text, (table_x + 100, row_y))
-            self.screen.blit(score_text, (table_x + 400, row_y))
-            self.screen.blit(time_text, (table_x + 500, row_y))
-            self.screen.blit(date_text, (table_x + 600, row_y))
-
-
+    def show_leaderboard(self):
+        # The table is only queried and composed again after navigating away from it
+        if 'leaderboard' not in self._table_cache:
+            # Fetch top 10 scores
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT username, score, survival_time, date 
+                FROM scores 
+                WHERE username != 'AI'
+                ORDER BY score DESC 
+                LIMIT 10
+            ''')
+            scores = cursor.fetchall()
+            self._table_cache['leaderboard'] = self._score_table(
+                [(i, *row) for i, row in enumerate(scores, 1)])
+
+        self._blit_score_table(self._table_cache['leaderboard'])
 
     def show_game_history(self):
-        cursor = self.conn.cursor()
-        
-        # First, fetch all scores and their ranks based on score
-        cursor.execute('''
-            SELECT username, score, survival_time, date,
-                (SELECT COUNT(*) + 1 FROM scores s2 WHERE s2.score > s1.score AND s2.username != 'AI') AS rank
-            FROM scores s1
-            WHERE username != 'AI'
-            ORDER BY date DESC
-            LIMIT 10
-        ''')
-        scores = cursor.fetchall()
-        
-        # Render leaderboard
-        y_offset = SCREEN_HEIGHT // 5
-
-        # Table setup
-        table_width = 600
-        table_x = (SCREEN_WIDTH - table_width) // 3 - 150
-        header_text = self.small_font.render('Rank', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x, y_offset + 40))
-        header_text = self.small_font.render('Name', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 100, y_offset + 40))
-        header_text = self.small_font.render('Score', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 400, y_offset + 40))
-        header_text = self.small_font.render('Time', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 500, y_offset + 40))
-        header_text = self.small_font.render('Date', True, LIGHT_BLUE)
-        self.screen.blit(header_text, (table_x + 600, y_offset + 40))
-        
-        # Display scores with their actual rank by score
-        for i, (username, score, survival_time, date, rank) in enumerate(scores, 1):
-            row_y = y_offset + 80 + i * 30
+        if 'history' not in self._table_cache:
+            cursor = self.conn.cursor()
             
-            rank_text = self.small_font.render(str(rank), True, WHITE)
-            name_text = self.small_font.render(username[:12], True, WHITE)  # Limit name length
-            score_text = self.small_font.render(str(score), True, WHITE)
-            time_text = self.small_font.render(f'{survival_time // 60:.0f}min', True, WHITE)
-            date_text = self.small_font.render(date.split()[0], True, WHITE)
-            self.screen.blit(rank_text, (table_x, row_y))
-            self.screen.blit(name_text, (table_x + 100, row_y))
-            self.screen.blit(score_text, (table_x + 400, row_y))
-            self.screen.blit(time_text, (table_x + 500, row_y))
-            self.screen.blit(date_text, (table_x + 600, row_y))
-
+            # First, rank all scores (one sort, no per-row subquery), then keep the latest games
+            cursor.execute('''
+                SELECT username, score, survival_time, date, rank FROM (
+                    SELECT username, score, survival_time, date,
+                        RANK() OVER (ORDER BY score DESC) AS rank
+                    FROM scores
+                    WHERE username != 'AI'
+                )
+                ORDER BY date DESC
+                LIMIT 10
+            ''')
+            scores = cursor.fetchall()
+
+            # Display scores with their actual rank by score
+            self._table_cache['history'] = self._score_table(
+                [(rank, username, score, survival_time, date)
+                 for username, score, survival_time, date, rank in scores])
+
+        self._blit_score_table(self._table_cache['history'])
 
     def draw_grid(self, player):
-        # Draw vertical lines
-        for x in range(GRID_COLUMNS + 1):
-            start_pos = (player.x_offset + x * BLOCK_SIZE, 0)
-            end_pos = (player.x_offset + x * BLOCK_SIZE, GAME_HEIGHT)
-            pygame.draw.line(self.screen, GRAY, start_pos, end_pos, 1)
-        # Draw horizontal lines
-        for y in range(GRID_ROWS + 1):
-            start_pos = (player.x_offset, y * BLOCK_SIZE)
-            end_pos = (player.x_offset + GAME_WIDTH, y * BLOCK_SIZE)
-            pygame.draw.line(self.screen, GRAY, start_pos, end_pos, 1)
+        self.screen.blit(self.grid_surf, (player.x_offset, 0))
 
     def draw_piece(self, piece, x_offset_pixels):
-        for y, row in enumerate(piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    rect = [
-                        x_offset_pixels + (piece.x + x) * BLOCK_SIZE,
-                        (piece.y + y) * BLOCK_SIZE,
-                        BLOCK_SIZE - 1,
-                        BLOCK_SIZE - 1
-                    ]
-                    pygame.draw.rect(self.screen, piece.color, rect)
-
-    def is_valid_move(self, piece, dx=0, dy=0, grid=None):
-        if grid is None:
-            # Default to human grid if piece is human's current piece, else AI's
-            grid = self.human_player.grid if piece == self.human_player.current_piece else self.ai_player.grid
-        
-        for y, row in enumerate(piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    new_x = piece.x + x + dx
-                    new_y = piece.y + y + dy
-                    
-                    # Check grid boundaries
-                    if (new_x < 0 or new_x >= len(grid[0]) or new_y >= len(grid)):
-                        return False
-                    
-                    # Check collision with existing blocks
-                    if new_y >= 0 and grid[new_y][new_x] != BLACK:
-                        return False
+        block = self.block_surfs[piece.color_idx]
+        col_pix = self._col_pix
+        row_pix = self._row_pix
+        left = x_offset_pixels + col_pix[piece.x]
+        top = row_pix[piece.y]
+        self._blit_batch([
+            (block, (left + col_pix[x], top + row_pix[y]))
+            for y, row in enumerate(piece.shape)
+            for x, cell in enumerate(row)
+            if cell
+        ])
+
+    def draw_board(self, player):
+        if player.board_dirty:
+            blocks = self.block_surfs
+            col_pix = self._col_pix
+            row_pix = self._row_pix
+            ys, xs = np.nonzero(player.grid)
+            cells = player.grid[ys, xs]
+
+            board_surf = player.board_surf
+            board_surf.fill(BLACK)
+            board_surf.blits([
+                (blocks[cell], (col_pix[x], row_pix[y]))
+                for y, x, cell in zip(ys.tolist(), xs.tolist(), cells.tolist())
+            ])
+            player.board_dirty = False
+        self.screen.blit(player.board_surf, (player.x_offset, 0))
+
+    def is_valid_move(self, piece, dx=0, dy=0, cols=None):
+        if cols is None:
+            # Default to human board if piece is human's current piece, else AI's
+            cols = self.human_player.cols if piece == self.human_player.current_piece else self.ai_player.cols
+
+        piece_cols, _, piece_height, _ = SHAPE_ROT_COLUMNS[piece.shape_id][piece.rotation]
+        new_x = piece.x + dx
+        new_y = piece.y + dy
+
+        # Check grid boundaries (every row and column of a piece's layout has a block)
+        if new_x < 0 or new_x + len(piece_cols) > GRID_COLUMNS or new_y + piece_height > GRID_ROWS:
+            return False
+
+        # Check collision with existing blocks: line the piece's column words up with
+        # its row on the board; cells above the top never collide
+        shift = GRID_ROWS - new_y - piece_height
+        for i, word in enumerate(piece_cols):
+            if (int(word) << shift) & int(cols[new_x + i]):
+                return False
         return True
 
     def save_scores(self):
@@ -553,35 +770,33 @@ class TetrisGame:
         
         # Determine winner
         winner = "AI" if self.human_player.game_over else "Human"
-        
-        # Save game history
-        cursor.execute('''
-            INSERT INTO game_history 
-            (username, winner, human_score, ai_score, survival_time, date) 
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (self.human_player.username, winner, 
-            self.human_player.score, self.ai_player.score, 
-            min(self.human_player.survival_time, self.ai_player.survival_time), 
-            current_date))
-
-        # Save individual player scores
+
+        # Individual player scores, AI last
+        scores = []
         if hasattr(self.human_player, 'username'):
+            scores.append((self.human_player.username, self.human_player.score,
+                           self.human_player.survival_time, current_date))
+        scores.append(('AI', self.ai_player.score,
+                       self.ai_player.survival_time, current_date))
+
+        # Everything is written in a single transaction, committed on leaving the block
+        with self.conn:
+            # Save game history
             cursor.execute('''
+                INSERT INTO game_history 
+                (username, winner, human_score, ai_score, survival_time, date) 
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (self.human_player.username, winner, 
+                self.human_player.score, self.ai_player.score, 
+                min(self.human_player.survival_time, self.ai_player.survival_time), 
+                current_date))
+
+            # Save individual player scores
+            cursor.executemany('''
                 INSERT INTO scores 
                 (username, score, survival_time, date) 
                 VALUES (?, ?, ?, ?)
-            ''', (self.human_player.username, self.human_player.score, 
-                self.human_player.survival_time, current_date))
-        
-        # Save AI score
-        cursor.execute('''
-            INSERT INTO scores 
-            (username, score, survival_time, date) 
-            VALUES (?, ?, ?, ?)
-        ''', ('AI', self.ai_player.score, 
-            self.ai_player.survival_time, current_date))
-        
-        self.conn.commit()
+            ''', scores)
 
 
     def run(self):
@@ -596,13 +811,47 @@ class TetrisGame:
         speed_level = 1
 
         paused = False
+        pause_drawn = False
         music_paused = False
 
+        # Only the boards and the HUD text change between frames, so only those areas are
+        # sent to the display. The whole screen is flipped on the first frame, after a
+        # dialog or the pause overlay, or when the boards cover most of the screen anyway
+        board_rects = [pygame.Rect(player.x_offset, 0, GAME_WIDTH + 1, GAME_HEIGHT + 1)
+                       for player in (self.human_player, self.ai_player)]
+        partial_updates = 2 * sum(rect.w * rect.h for rect in board_rects) < SCREEN_WIDTH * SCREEN_HEIGHT
+        full_redraw = True
+        last_hud_rects = []
+
+        # Values shown by the HUD scores (None until the first frame renders them);
+        # the speed text only changes with fall_speed, when the game speeds up
+        shown_human_score = None
+        shown_ai_score = None
+        speed_text = self._text(f"SPEED: x{0.5/fall_speed:.2f}", self.font, GRAY)
+
+        # HUD text positions
+        p1_pos = (self.human_x, GAME_HEIGHT + 10)
+        p2_pos = (self.ai_x, GAME_HEIGHT + 10)
+        speed_pos = (20, 20)
+        instructions_pos = (20, GAME_HEIGHT + 70)
+
+        # Locals for the per-frame lookups; the players are reset in place, never replaced
+        human = self.human_player
+        ai = self.ai_player
+        screen = self.screen
+        clock = self.clock
+        font = self.font
+        blit_batch = self._blit_batch
+        is_valid_move = self.is_valid_move
+
         while not self.game_over:
             # Handle events
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     return
+
+                if event.type == pygame.VIDEOEXPOSE:
+                    full_redraw = True
                 
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
@@ -610,50 +859,51 @@ class TetrisGame:
                         if confirm:
                             self.game_over = True
                             return
+                        full_redraw = True
                     elif event.key == pygame.K_SPACE:
                         music_paused = not music_paused
                         pygame.mixer.music.pause() if music_paused else pygame.mixer.music.unpause()
                     elif event.key == pygame.K_p:
                         paused = not paused
+                        pause_drawn = False
+                        full_redraw = True
                         pygame.mixer.music.pause() if paused else pygame.mixer.music.unpause()
                     elif event.key == pygame.K_r:
                         if self.show_confirmation_dialog("Restart game?", "Are you sure you want to restart? All the results of this game will be lost"):
                             self.reset()
+                        full_redraw = True
                     
                     if not paused:
-                        if event.key == self.human_player.controls['left']:
-                            if self.is_valid_move(self.human_player.current_piece, dx=-1):
-                                self.human_player.current_piece.move(-1, 0)
+                        if event.key == human.controls['left']:
+                            if is_valid_move(human.current_piece, dx=-1):
+                                human.current_piece.move(-1, 0)
                         
-                        if event.key == self.human_player.controls['right']:
-                            if self.is_valid_move(self.human_player.current_piece, dx=1):
-                                self.human_player.current_piece.move(1, 0)
+                        if event.key == human.controls['right']:
+                            if is_valid_move(human.current_piece, dx=1):
+                                human.current_piece.move(1, 0)
                         
-                        if event.key == self.human_player.controls['down']:
-                            if self.is_valid_move(self.human_player.current_piece, dy=1):
-                                self.human_player.current_piece.move(0, 1)
+                        if event.key == human.controls['down']:
+                            if is_valid_move(human.current_piece, dy=1):
+                                human.current_piece.move(0, 1)
                         
-                        if event.key == self.human_player.controls['rotate']:
-                            rotated_piece = Tetromino()
-                            rotated_piece.shape = [row[:] for row in self.human_player.current_piece.shape]
-                            for _ in range(1):  # Rotate once (clockwise)
-                                rotated_piece.shape = list(zip(*rotated_piece.shape[::-1]))
-                            rotated_piece.x = self.human_player.current_piece.x
-                            rotated_piece.y = self.human_player.current_piece.y
-                            rotated_piece.color = self.human_player.current_piece.color
-                            
-                            if self.is_valid_move(rotated_piece, grid=self.human_player.grid):
-                                self.human_player.current_piece.rotate()
+                        if event.key == human.controls['rotate']:
+                            rotated_piece = _clone(human.current_piece)
+                            rotated_piece.rotate()  # Rotate once (clockwise)
+
+                            if is_valid_move(rotated_piece, cols=human.cols):
+                                human.current_piece.rotate()
 
             if paused:
-                pause_text = self.font.render("PAUSED - Press P to resume", True, WHITE)
-                text_rect = pause_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-                self.screen.blit(pause_text, text_rect)
-                pygame.display.flip()
+                # The paused frame is static: draw the overlay once, then just poll for input at 10 FPS
+                if not pause_drawn:
+                    screen.blit(self._pause_surf, self._pause_rect)
+                    pygame.display.flip()
+                    pause_drawn = True
+                clock.tick(10)
                 continue
             
-            if isinstance(self.ai_player, AIPlayer):
-                self.ai_player.make_move(self)
+            if isinstance(ai, AIPlayer):
+                ai.follow_plan(self)
 
             current_time = pygame.time.get_ticks()
             
@@ -662,109 +912,111 @@ class TetrisGame:
             if elapsed_seconds >= speed_level * update_interval:
                 fall_speed = max(0.1, fall_speed * 0.9)  # Reduce fall time by 10%, but not below 0.1 seconds
                 speed_level += 1
+                speed_text = self._text(f"SPEED: x{0.5/fall_speed:.2f}", font, GRAY)
             
             if current_time - last_fall_time > fall_speed * 1000:
-                if self.is_valid_move(self.human_player.current_piece, dy=1):
-                    self.human_player.current_piece.move(0, 1)
+                if is_valid_move(human.current_piece, dy=1):
+                    human.current_piece.move(0, 1)
                 else:
-                    self.lock_piece(self.human_player)
-                    self.human_player.current_piece = Tetromino()
+                    self.lock_piece(human)
+                    human.current_piece = Tetromino()
                     
-                    if not self.is_valid_move(self.human_player.current_piece):
-                        self.human_player.game_over = True
+                    if not is_valid_move(human.current_piece):
+                        human.game_over = True
 
-                if self.is_valid_move(self.ai_player.current_piece, dy=1):
-                    self.ai_player.current_piece.move(0, 1)
+                if is_valid_move(ai.current_piece, dy=1):
+                    ai.current_piece.move(0, 1)
                 else:
-                    self.lock_piece(self.ai_player)
-                    self.ai_player.current_piece = Tetromino()
+                    self.lock_piece(ai)
+                    ai.current_piece = Tetromino()
+                    ai.plan = None
                     
-                    if not self.is_valid_move(self.ai_player.current_piece):
-                        self.ai_player.game_over = True
+                    if not is_valid_move(ai.current_piece):
+                        ai.game_over = True
                 
                 last_fall_time = current_time
 
-                self.human_player.survival_time = (current_time - self.start_time) / 1000
-                self.ai_player.survival_time = (current_time - self.start_time) / 1000
+                human.survival_time = (current_time - self.start_time) / 1000
+                ai.survival_time = (current_time - self.start_time) / 1000
 
-            if self.human_player.game_over or self.ai_player.game_over:
+            if human.game_over or ai.game_over:
                 self.game_over = True
 
-            self.screen.fill(BLACK)
-            
-            self.draw_grid(self.human_player)
-            self.draw_grid(self.ai_player)
+            screen.fill(BLACK)
             
-            self.draw_piece(self.human_player.current_piece, self.human_player.x_offset)
-            self.draw_piece(self.ai_player.current_piece, self.ai_player.x_offset)
+            self.draw_grid(human)
+            self.draw_grid(ai)
             
-            for y, row in enumerate(self.human_player.grid):
-                for x, color in enumerate(row):
-                    if color != BLACK:
-                        pygame.draw.rect(
-                            self.screen, color,
-                            (self.human_player.x_offset + x * BLOCK_SIZE,
-                            y * BLOCK_SIZE,
-                            BLOCK_SIZE - 1, BLOCK_SIZE - 1)
-                        )
+            self.draw_piece(human.current_piece, human.x_offset)
+            self.draw_piece(ai.current_piece, ai.x_offset)
             
-            for y, row in enumerate(self.ai_player.grid):
-                for x, color in enumerate(row):
-                    if color != BLACK:
-                        pygame.draw.rect(
-                            self.screen, color,
-                            (self.ai_player.x_offset + x * BLOCK_SIZE,
-                            y * BLOCK_SIZE,
-                            BLOCK_SIZE - 1, BLOCK_SIZE - 1)
-                        )
-
-            p1_text = self.font.render(f'Human: {self.human_player.score}', True, LIGHT_BLUE)
-            p2_text = self.font.render(f'AI: {self.ai_player.score}', True, LIGHT_GREEN)
-            self.screen.blit(p1_text, (self.human_x, GAME_HEIGHT + 10))
-            self.screen.blit(p2_text, (self.ai_x, GAME_HEIGHT + 10))
-
-            speed_text = self.font.render(f"SPEED: x{0.5/fall_speed:.2f}", True, GRAY)
-            self.screen.blit(speed_text, (20,20))
-
-            # Update the instructions to show current speed level
-            instructions = self.small_font.render("ESC: Exit Game | SPACE: Mute/Unmute | P: Pause/Unpause | R: Restart", True, GRAY)
-            self.screen.blit(instructions, (20, GAME_HEIGHT + 70))
-
-            pygame.display.flip()
-            self.clock.tick(60)
+            self.draw_board(human)
+            self.draw_board(ai)
+
+            # The score strings are only formatted again when their value changes
+            if human.score != shown_human_score:
+                shown_human_score = human.score
+                p1_text = self._text(f'Human: {shown_human_score}', font, LIGHT_BLUE)
+            if ai.score != shown_ai_score:
+                shown_ai_score = ai.score
+                p2_text = self._text(f'AI: {shown_ai_score}', font, LIGHT_GREEN)
+
+            hud = [
+                (p1_text, p1_pos),
+                (p2_text, p2_pos),
+                (speed_text, speed_pos),
+                (self._run_instructions_surf, instructions_pos),
+            ]
+            blit_batch(hud)
+            hud_rects = [text.get_rect(topleft=pos) for text, pos in hud]
+
+            if full_redraw or not partial_updates:
+                pygame.display.flip()
+                full_redraw = False
+            else:
+                # Last frame's text areas too, in case a string got shorter
+                pygame.display.update(board_rects + hud_rects + last_hud_rects)
+            last_hud_rects = hud_rects
+            # tick() sleeps, and OS sleeps can overshoot by several ms; this waits out the
+            # frame exactly. (vsync would need a SCALED display, whose renderer presents the
+            # whole screen on every update and so would defeat the partial updates above)
+            clock.tick_busy_loop(60)
 
         self.save_scores()
         self.show_game_over_screen()
 
 
     def show_game_over_screen(self):
+        # The results don't change while this screen is up: lay it out once
+        winner = "Human Player" if self.ai_player.game_over else "AI"
+        game_duration = min(self.human_player.survival_time, self.ai_player.survival_time)
+        left = SCREEN_WIDTH // 3
+        middle = SCREEN_HEIGHT // 2
+        blits = [
+            (self._game_over_instructions_surf, (20, middle + 100)),
+            (self._game_over_surf, (left - 100, middle - 300)),
+            (self._text(f'Winner: {winner}', self.font, WHITE), (left - 100, middle - 250)),
+            (self._text(f'Human Player Score: {self.human_player.score}', self.font, LIGHT_BLUE), (left - 200, middle - 200)),
+            (self._text(f'AI Score: {self.ai_player.score}', self.font, LIGHT_GREEN), (left - 200, middle - 150)),
+            (self._text(f'Game duration: {game_duration:.2f}s', self.font, LIGHT_BLUE), (left - 200, middle - 100)),
+        ]
+
         game_over = True
+        drawn = False
         while game_over:
-            self.screen.fill(BLACK)
-            
-            winner = "Human Player" if self.ai_player.game_over else "AI"
-            
-            game_over_text = self.font.render('GAME OVER', True, WHITE)
-            winner_text = self.font.render(f'Winner: {winner}', True, WHITE)
-            p1_score_text = self.font.render(f'Human Player Score: {self.human_player.score}', True, LIGHT_BLUE)
-            p2_score_text = self.font.render(f'AI Score: {self.ai_player.score}', True, LIGHT_GREEN)
-            game_duration_text = self.font.render(f'Game duration: {min(self.human_player.survival_time, self.ai_player.survival_time):.2f}s', True, LIGHT_BLUE)
-            
-
-            instructions = self.small_font.render("ESC: Exit Game | SPACE: Mute/Unmute | P: Pause/Unpause | M: Main menu", True, GRAY)
-            self.screen.blit(instructions, (20, SCREEN_HEIGHT//2 + 100))
-
-            self.screen.blit(game_over_text, (SCREEN_WIDTH // 3 - 100, SCREEN_HEIGHT // 2 - 300))
-            self.screen.blit(winner_text, (SCREEN_WIDTH // 3 - 100, SCREEN_HEIGHT // 2 - 250))
-            self.screen.blit(p1_score_text, (SCREEN_WIDTH // 3 - 200, SCREEN_HEIGHT // 2 - 200))
-            self.screen.blit(p2_score_text, (SCREEN_WIDTH // 3 - 200, SCREEN_HEIGHT // 2 - 150))
-            self.screen.blit(game_duration_text, (SCREEN_WIDTH // 3 - 200, SCREEN_HEIGHT // 2 - 100))
-        
-            pygame.display.flip()
+            # The screen is static: draw it once, then just poll for input at 30 FPS
+            if not drawn:
+                self.screen.fill(BLACK)
+                self._blit_batch(blits)
+                pygame.display.flip()
+                drawn = True
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     return
+
+                if event.type == pygame.VIDEOEXPOSE:
+                    drawn = False
                 
                 if event.type == pygame.KEYDOWN:
                     
@@ -772,24 +1024,56 @@ class TetrisGame:
                         game_over = False
                         self.show_start_screen()
 
+            self.clock.tick(30)
+
+    def update_column_stats(self, player, columns):
+        # Refresh the cached height and hole count of the given columns from the bitboard
+        for grid_x in columns:
+            word = int(player.cols[grid_x])
+            height = word.bit_length()
+            player.col_heights[grid_x] = height
+            player.col_holes[grid_x] = height - bin(word).count('1')
+
     def lock_piece(self, player):
-        for y, row in enumerate(player.current_piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    grid_x = player.current_piece.x + x
-                    grid_y = player.current_piece.y + y
-                    if 0 <= grid_y < len(player.grid):
-                        player.grid[grid_y][grid_x] = player.current_piece.color
-
-        lines_cleared = 0
-        for i, row in enumerate(player.grid[:]):
-            if all(cell != BLACK for cell in row):
-                del player.grid[i]
-                player.grid.insert(0, [BLACK for _ in range(len(row))])
-                lines_cleared += 1
+        piece = player.current_piece
+        piece_cols, _, piece_height, piece_cells = SHAPE_ROT_COLUMNS[piece.shape_id][piece.rotation]
+        piece_ys, piece_xs = SHAPE_ROT_CELLS[piece.shape_id][piece.rotation]
+
+        # Pieces spawn in the top row and only move down, so every cell is on the board
+        player.grid[piece.y + piece_ys, piece.x + piece_xs] = piece.color_idx
+        player.cols[piece.x:piece.x + len(piece_cols)] |= piece_cols << (GRID_ROWS - piece.y - piece_height)
+
+        block = self.block_surfs[piece.color_idx]
+        for y, x in piece_cells:
+            grid_x = piece.x + x
+            grid_y = piece.y + y
+            player.grid_hash ^= ZOBRIST[grid_y][grid_x]
+            player.board_surf.blit(block, (self._col_pix[grid_x], self._row_pix[grid_y]))
+
+        # Only the columns under the piece changed
+        self.update_column_stats(player, range(piece.x, piece.x + len(piece_cols)))
+
+        # A row is full when its bit is set in every column word
+        full_rows = int(np.bitwise_and.reduce(player.cols))
 
+        lines_cleared = bin(full_rows).count('1')
         if lines_cleared > 0:
-            player.score += [40, 100, 300, 1200][lines_cleared - 1]
+            # Remove the full rows' bits from top to bottom so the lower bit positions stay valid
+            for bit in reversed(range(GRID_ROWS)):
+                if full_rows >> bit & 1:
+                    below = (1 << bit) - 1
+                    player.cols = (player.cols & below) | (player.cols >> (bit + 1) << bit)
+
+            # Keep the other rows in one pass and fill the top with empty rows
+            kept = player.grid[(full_rows >> ROW_BITS) & 1 == 0]
+            player.grid[:lines_cleared] = 0
+            player.grid[lines_cleared:] = kept
+
+            # Clearing can uncover holes under a column's top block, so every column is updated
+            self.update_column_stats(player, range(GRID_COLUMNS))
+            player.grid_hash = _grid_hash(player.grid)
+            player.board_dirty = True
+            player.score += LINE_SCORES[lines_cleared - 1]
     
 def main():
     game = TetrisGame()